@@ -1,108 +1,149 @@
 import argparse
 import csv
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from xml.sax.saxutils import escape
+from pathlib import Path
 import re
-import os
 
 
 FP_CADENCE = 150
 
-def get_zone(name:str, abbreviation:str, cts:int, min_percentage:int, max_percentage:int):
+# The columns that must all be present (and non-empty) for an interval block to exist
+INTERVAL_FIELDS = ('Intensity', 'Reps', 'Duration', 'Sets', 'RBI', 'RBS')
+
+# Numbered column names ('Reps 1', 'Reps 2', ...) are precomputed per interval block so the
+# row-parsing path never formats the same key twice. Index 0 is unused as blocks start at 1
+INTERVAL_COLUMNS = [{field: f'{field} {i}' for field in INTERVAL_FIELDS + ('RAS',)} for i in range(17)]
+
+# An interval block from a row of the CSV input file with every numeric field already parsed
+Interval = namedtuple('Interval', ('intensity', 'reps', 'duration', 'sets', 'rbi', 'rbs', 'ras'))
+
+# Patterns for the over and under durations in an over-under descriptor like 'OU (2U,1O)'
+OVER_PATTERN = re.compile(r'(\d+)o')
+UNDER_PATTERN = re.compile(r'(\d+)u')
+
+def get_zone(cts:int, min_percentage:int, max_percentage:int):
     """
-    Produces a TCTP zone with a given name and range
-    :param name: The name of the TCTP zone
-    :param abbreviation: An abbreviation for the training zone
+    Produces a TCTP zone with a given range
     :param cts: The CTS test power
     :param min_percentage: The lower end of the power zone as a percentage of the CTS test
     :param max_percentage: The upper end of the power zone as a percentage of the CTS test
-    :return: The TCTP zone
+    :return: The TCTP zone as a (min, max) power tuple
     """
-    return {
-        'name': name,
-        'abbreviation': abbreviation,
-        'min': cts * min_percentage / 100,
-        'max': cts * max_percentage / 100
-    }
+    return cts * min_percentage / 100, cts * max_percentage / 100
 
 
 def get_power_zones(cts_power:int):
     """
-    Gets the TCTP power zones as described in the book
+    Gets the TCTP power zones as described in the book, keyed by abbreviation
     :param cts_power: The CTS test power
-    :return: The TCTP power zones
+    :return: The TCTP power zones as a dictionary of abbreviation to (min, max) power tuples
     """
-    zones = list()
-    zones.append(get_zone('Endurance Miles', 'EM', cts_power, 45, 73))
-    zones.append(get_zone('Tempo', 'T', cts_power, 80, 85))
-    zones.append(get_zone('Steady State', 'SS', cts_power, 86, 90))
-    zones.append(get_zone('Climbing Repeat', 'CR', cts_power, 95, 100))
-    zones.append(get_zone('Power Interval', 'PI', cts_power, 101, 150))
-    return zones
+    return {
+        'EM': get_zone(cts_power, 45, 73),      # Endurance Miles
+        'T': get_zone(cts_power, 80, 85),       # Tempo
+        'SS': get_zone(cts_power, 86, 90),      # Steady State
+        'CR': get_zone(cts_power, 95, 100),     # Climbing Repeat
+        'PI': get_zone(cts_power, 101, 150)     # Power Interval
+    }
 
 
 def get_power_percentage(zones, desired_zone, zwift_ftp, midpoint):
     """
     Gets the power as a percentage of the Zwift FTP.
     This is needed because Zwift workouts are generated using a percentage of FTP rather than raw power
-    :param zones: TCTP power zones
+    :param zones: TCTP power zones keyed by abbreviation
     :param desired_zone: The abbreviation of the desired zone
     :param zwift_ftp: FTP according to Zwift
     :param midpoint: The point between the lower and upper bounds of the power zone to use
     :return: The specified power zone as a percentage of Zwift FTP
     """
-    zone_list = list(filter(lambda z: z['abbreviation'] == desired_zone, zones))
-    if len(zone_list) == 1:
-        zone = zone_list[0]
-        desired_power = zone['min'] + ((zone['max'] - zone['min']) * midpoint)
+    zone = zones.get(desired_zone)
+    if zone is not None:
+        zone_min, zone_max = zone
+        desired_power = zone_min + ((zone_max - zone_min) * midpoint)
         return desired_power / zwift_ftp
     return 0
 
 
-def row_has_intervals(csv_row, interval_count):
+def get_interval_columns(interval_count):
     """
-    Checks whether a row has entries for the given interval number
-    :param csv_row: A row from the CSV input file
-    :param interval_count: The interval to check the presence of
-    :return: True if the interval exists, false otherwise
+    Gets the precomputed column names for a given interval block, growing the table if a
+    workout has more interval blocks than have been seen before
+    :param interval_count: The index of the interval block (starting at 1)
+    :return: A dictionary of field name to numbered column name for the block
     """
-    if f'Intensity {interval_count}' in csv_row and \
-            f'Reps {interval_count}' in csv_row and \
-            f'Duration {interval_count}' in csv_row and \
-            f'Sets {interval_count}' in csv_row and \
-            f'RBI {interval_count}' in csv_row and \
-            f'RBS {interval_count}' in csv_row and \
-            not csv_row[f'Intensity {interval_count}'].strip() == '' and \
-            not csv_row[f'Reps {interval_count}'].strip() == '' and \
-            not csv_row[f'Duration {interval_count}'].strip() == '' and \
-            not csv_row[f'Sets {interval_count}'].strip() == '' and \
-            not csv_row[f'RBI {interval_count}'].strip() == '' and \
-            not csv_row[f'RBS {interval_count}'].strip() == '':
-        return True
-    return False
-
-
-def get_interval_duration(csv_row, interval_count):
+    while len(INTERVAL_COLUMNS) <= interval_count:
+        INTERVAL_COLUMNS.append({field: f'{field} {len(INTERVAL_COLUMNS)}' for field in INTERVAL_FIELDS + ('RAS',)})
+    return INTERVAL_COLUMNS[interval_count]
+
+
+def get_cell(csv_row, column_indexes, column_name):
     """
-    Gets the total duration of one set of intervals including rest between reps, sets and rest after the sets
-    :param csv_row: A row from the CSV input file
-    :param interval_count: The interval to calculate the duration of
-    :return: The total duration of the interval in minutes
+    Gets a cell from a raw CSV row using the precomputed column index map
+    :param csv_row: A raw row (list of strings) from the CSV input file
+    :param column_indexes: A dictionary of column name to position in the row
+    :param column_name: The name of the column to fetch
+    :return: The cell value, or an empty string if the column is missing from the file or row
     """
-    # Get the durations of each rep
-    reps_duration = int(csv_row[f'Reps {interval_count}']) * (int(csv_row[f'Duration {interval_count}']) + int(csv_row[f'RBI {interval_count}']))
+    index = column_indexes.get(column_name, -1)
+    if 0 <= index < len(csv_row):
+        return csv_row[index]
+    return ''
 
-    # Get the total duration of all sets
-    total_duration = int(csv_row[f'Sets {interval_count}']) * (reps_duration + int(csv_row[f'RBS {interval_count}']))
 
-    # Remove the last RBS (no need to rest after the last set)
-    total_duration = total_duration - int(csv_row[f'RBS {interval_count}'])
+def row_has_intervals(csv_row, column_indexes, interval_count):
+    """
+    Checks whether a row has entries for the given interval number
+    :param csv_row: A raw row from the CSV input file
+    :param column_indexes: A dictionary of column name to position in the row
+    :param interval_count: The interval to check the presence of
+    :return: True if the interval exists, false otherwise
+    """
+    columns = get_interval_columns(interval_count)
+    for field in INTERVAL_FIELDS:
+        if get_cell(csv_row, column_indexes, columns[field]).strip() == '':
+            return False
+    return True
 
-    # If there is a rest after the sets then add this
-    if f'RAS {interval_count}' in csv_row and not csv_row[f'RAS {interval_count}'].strip() == '':
-        total_duration = total_duration + int(csv_row[f'RAS {interval_count}'])
 
-    return total_duration
+def get_intervals(csv_row, column_indexes):
+    """
+    Parses every interval block in a row into typed Interval tuples.
+    Each numeric field is converted exactly once here rather than every time it is needed
+    :param csv_row: A raw row from the CSV input file
+    :param column_indexes: A dictionary of column name to position in the row
+    :return: A list of Interval tuples, one per interval block in the row
+    """
+    intervals = list()
+    interval_count = 0
+    while row_has_intervals(csv_row, column_indexes, interval_count + 1):
+        interval_count = interval_count + 1
+        columns = get_interval_columns(interval_count)
+        ras = get_cell(csv_row, column_indexes, columns['RAS']).strip()
+        intervals.append(Interval(
+            intensity=get_cell(csv_row, column_indexes, columns['Intensity']).strip().upper(),
+            reps=int(get_cell(csv_row, column_indexes, columns['Reps'])),
+            duration=int(get_cell(csv_row, column_indexes, columns['Duration'])),
+            sets=int(get_cell(csv_row, column_indexes, columns['Sets'])),
+            rbi=int(get_cell(csv_row, column_indexes, columns['RBI'])),
+            rbs=int(get_cell(csv_row, column_indexes, columns['RBS'])),
+            ras=int(ras) if ras else 0
+        ))
+    return intervals
+
+
+def get_interval_duration(interval):
+    """
+    Gets the total duration of one set of intervals including rest between reps, sets and rest after the sets.
+    The last RBS is excluded (no need to rest after the last set) and any rest after the sets is included
+    :param interval: The parsed interval block
+    :return: The total duration of the interval in minutes
+    """
+    return interval.sets * (interval.reps * (interval.duration + interval.rbi) + interval.rbs) - interval.rbs + interval.ras
 
 
 def get_zwift_duration(csv_duration):
@@ -114,16 +155,31 @@ def get_zwift_duration(csv_duration):
     return int(csv_duration * 60)
 
 
+def get_textual_duration(duration_seconds):
+    """
+    Converts a duration in seconds to readable text for the workout description.
+    divmod plus an f-string is several times faster than time.gmtime/strftime and
+    this is called for every line of the description
+    :param duration_seconds: The duration in seconds
+    :return: The duration as HH:MM:SS (or MM:SS if under an hour)
+    """
+    hours, remainder = divmod(int(duration_seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f'{hours:02d}:{minutes:02d}:{seconds:02d}'
+    return f'{minutes:02d}:{seconds:02d}'
+
+
 def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_seconds):
     """
-    Gets an array of XML elements that represent an interval.
+    Gets an array of XML strings that represent an interval.
     This is often a single steady state effort but there are exceptions like over-unders and PFPI
     :param cts_power_zones: The CTS power zones
     :param on_zone: The name of the TCTP zone that represents this interval
     :param zwift_ftp: FTP according to Zwift
     :param midpoint: The midpoint in a workout range. For example if the EM zone is from 120-200 Watts and the midpoint is 0.5 then the power used for EM is 160 Watts.
     :param duration_seconds: The duration of this interval in seconds
-    :return: An array of XML elements that represent this workout
+    :return: An array of XML strings that represent this workout
     """
     # Get the on pace (assuming the effort is a straight up zone)
     on_pace = get_power_percentage(
@@ -135,10 +191,7 @@ def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_s
 
     # If we have have found a pace then the interval type maps directly to a zone (e.g. SS)
     if on_pace > 0:
-        on = ET.Element('SteadyState')
-        on.set('Duration', str(duration_seconds))
-        on.set('Power', str(on_pace))
-        return [on]
+        return [f'<SteadyState Duration="{duration_seconds}" Power="{on_pace}"/>']
 
     # If not then the we should check the special cases (e.g. SEPI)
     else:
@@ -150,10 +203,7 @@ def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_s
                 zwift_ftp=zwift_ftp,
                 midpoint=0.35
             )
-            on = ET.Element('SteadyState')
-            on.set('Duration', str(duration_seconds))
-            on.set('Power', str(on_pace))
-            return [on]
+            return [f'<SteadyState Duration="{duration_seconds}" Power="{on_pace}"/>']
         elif on_zone == 'FP':
             on_pace = get_power_percentage(
                 zones=cts_power_zones,
@@ -161,11 +211,7 @@ def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_s
                 zwift_ftp=zwift_ftp,
                 midpoint=0.35
             )
-            on = ET.Element('SteadyState')
-            on.set('Duration', str(duration_seconds))
-            on.set('Power', str(on_pace))
-            on.set('Cadence', str(FP_CADENCE))
-            return [on]
+            return [f'<SteadyState Duration="{duration_seconds}" Power="{on_pace}" Cadence="{FP_CADENCE}"/>']
         elif on_zone == 'PFPI':
             high_pace = get_power_percentage(
                 zones=cts_power_zones,
@@ -179,11 +225,7 @@ def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_s
                 zwift_ftp=zwift_ftp,
                 midpoint=0.3
             )
-            on = ET.Element('Ramp')
-            on.set('Duration', str(duration_seconds))
-            on.set('PowerLow', str(high_pace))
-            on.set('PowerHigh', str(low_pace))
-            return [on]
+            return [f'<Ramp Duration="{duration_seconds}" PowerLow="{high_pace}" PowerHigh="{low_pace}"/>']
         elif on_zone.lower().strip().startswith('ou'):
             return get_over_under_interval(
                 cts_power_zones=cts_power_zones,
@@ -198,16 +240,17 @@ def get_workout_period(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_s
 
 def get_over_under_interval(cts_power_zones, on_zone, zwift_ftp, midpoint, duration_minutes):
     """
-    Gets an array of steady state intervals that represent over-unders
+    Gets an array of steady state XML strings that represent over-unders
     :param cts_power_zones: The CTS power zones
     :param on_zone: The textual representation of over-unders (e.g. OU (2U,1O))
     :param zwift_ftp: FTP according to Zwift
     :param midpoint: The midpoint in a workout range. For example if the EM zone is from 120-200 Watts and the midpoint is 0.5 then the power used for EM is 160 Watts.
     :param duration_minutes: The duration of the entire over-under session (i.e. not an individual over or under)
-    :return: An array of XML elements that represent this over-under
+    :return: An array of XML strings that represent this over-under
     """
-    over_duration = get_zwift_duration(int(re.findall(r"(\d+)o", on_zone.lower())[0]))
-    under_duration = get_zwift_duration(int(re.findall(r"(\d+)u", on_zone.lower())[0]))
+    on_zone_lower = on_zone.lower()
+    over_duration = get_zwift_duration(int(OVER_PATTERN.search(on_zone_lower).group(1)))
+    under_duration = get_zwift_duration(int(UNDER_PATTERN.search(on_zone_lower).group(1)))
     over_unders = list()
     over_under_duration = 0
 
@@ -234,164 +277,182 @@ def get_over_under_interval(cts_power_zones, on_zone, zwift_ftp, midpoint, durat
     return over_unders
 
 
-def generate_workout(csv_row, prefix:str, cts_power_zones, zwift_ftp, midpoint, directory):
+def build_workout(csv_row, column_indexes, prefix:str, cts_power_zones, zwift_ftp, midpoint):
     """
-    Generates a ZWO file that represent the training plan described in the CSV row
-    :param csv_row: The CSV row representing the workout
+    Builds the ZWO document that represents the training plan described in the CSV row
+    :param csv_row: The raw CSV row representing the workout
+    :param column_indexes: A dictionary of column name to position in the row
     :param prefix: A prefix to add to the week/day workout name
     :param cts_power_zones: The CTS power zones
     :param zwift_ftp: FTP according to Zwift
     :param midpoint: The midpoint in a workout range. For example if the EM zone is from 120-200 Watts and the midpoint is 0.5 then the power used for EM is 160 Watts.
-    :param directory: The directory to put the workout files in
-    :return: True if the workout was created, false otherwise
+    :return: The workout name and the XML lines of the document
     """
     # Get the title of the workout
     space = '' if len(prefix) == 0 else ' '
-    week = csv_row['Week']
-    day = csv_row['Day']
+    week = get_cell(csv_row, column_indexes, 'Week')
+    day = get_cell(csv_row, column_indexes, 'Day')
     workout_name = f'{prefix}{space}Week {week} {day}'
 
+    # Parse every interval block in the row up front so each numeric field is converted once
+    intervals = get_intervals(csv_row, column_indexes)
+    interval_count = len(intervals)
+
     # Find the total duration of all intervals in this workout
     # We'll use this to work out how much of the base intensity we need to put between each interval set
-    total_intervals_duration = 0
-    interval_count = 0
-    while row_has_intervals(csv_row, interval_count + 1):
-        interval_count = interval_count + 1
-        total_intervals_duration = total_intervals_duration + get_interval_duration(csv_row, interval_count)
+    total_intervals_duration = sum(get_interval_duration(interval) for interval in intervals)
 
     # Work out how much of the base intensity we need between each interval set
-    warm_up_duration = int(csv_row['Warm up'])
-    cool_down_duration = int(csv_row['Cool down'])
-    total_duration = int(csv_row['Total duration'])
+    warm_up_duration = int(get_cell(csv_row, column_indexes, 'Warm up'))
+    cool_down_duration = int(get_cell(csv_row, column_indexes, 'Cool down'))
+    total_duration = int(get_cell(csv_row, column_indexes, 'Total duration'))
     filler_duration = get_zwift_duration((total_duration - warm_up_duration - cool_down_duration - total_intervals_duration) / (interval_count + 1))
     base_pace = get_power_percentage(
         zones=cts_power_zones,
-        desired_zone=csv_row['Base'],
+        desired_zone=get_cell(csv_row, column_indexes, 'Base'),
         zwift_ftp=zwift_ftp,
         midpoint=midpoint
     )
 
-    # Create root element
-    workout_file = ET.Element('workout_file')
+    # Build the document directly as a list of lines.
+    # The .zwo schema is small and fixed so there is no need to build a full XML tree only to pretty-print it
+    parts = list()
+    parts.append('<?xml version="1.0" encoding="UTF-8"?>')
+    parts.append('<workout_file>')
 
     # Create the workout metadata
-    author = ET.SubElement(workout_file, 'author')
-    author.text = 'TCTP Zwift workout generator'
-    name = ET.SubElement(workout_file, 'name')
-    name.text = workout_name
-    description = ET.SubElement(workout_file, 'description')
-    sportType = ET.SubElement(workout_file, 'sportType')
-    sportType.text = 'bike'
+    parts.append('   <author>TCTP Zwift workout generator</author>')
+    parts.append(f'   <name>{escape(workout_name)}</name>')
+
+    # The description is built up as the workout sections are added below,
+    # so remember where it belongs and fill it in at the end
+    workout_description = list()
+    description_index = len(parts)
+    parts.append('   <description/>')
+    parts.append('   <sportType>bike</sportType>')
 
     # Add tag(s)
-    tags = ET.SubElement(workout_file, 'tags')
-    tctp_tag = ET.SubElement(workout_file, 'tag')
-    tctp_tag.set('name', 'TCTP')
+    parts.append('   <tags>')
+    parts.append('      <tag name="TCTP"/>')
+    parts.append('   </tags>')
 
     # Add the actual workout
-    workout = ET.SubElement(workout_file, 'workout')
+    parts.append('   <workout>')
 
     # Add the warm up
     if warm_up_duration > 0:
-        warm_up = ET.SubElement(workout, 'Warmup')
-        warm_up.set('Duration', str(get_zwift_duration(warm_up_duration)))
-        warm_up.set('PowerLow', '0.25')
-        warm_up.set('PowerHigh', '0.75')
+        parts.append(f'      <Warmup Duration="{get_zwift_duration(warm_up_duration)}" PowerLow="0.25" PowerHigh="0.75"/>')
+        workout_description.append(f'{get_textual_duration(get_zwift_duration(warm_up_duration))} warm up')
 
     # If we need any filler before we get into the intervals add it here
+    filler = f'      <SteadyState Duration="{filler_duration}" Power="{base_pace}"/>'
+    filler_description = f'{get_textual_duration(filler_duration)} @ {int(base_pace * zwift_ftp)} Watts'
     if filler_duration > 0:
-        filler = ET.SubElement(workout, 'SteadyState')
-        filler.set('Duration', str(filler_duration))
-        filler.set('Power', str(base_pace))
+        parts.append(filler)
+        workout_description.append(filler_description)
 
     # Loop through the interval sets and append them to the the XML
-    for interval_index in range(1, interval_count + 1):
+    for interval in intervals:
 
-        # Get the pace for the 'on' part of the intervals
-        on_zone = csv_row[f'Intensity {interval_index}'].strip().upper()
-        on_pace = get_power_percentage(
-            zones=cts_power_zones,
-            desired_zone=on_zone,
-            zwift_ftp=zwift_ftp,
-            midpoint=midpoint
-        )
+        # Get the zone for the 'on' part of the intervals
+        on_zone = interval.intensity
 
         # Get the pace for the rest sections (default to 0.5)
         off_pace = 0.5
 
         # Get the number of reps and sets
-        reps = int(csv_row[f'Reps {interval_index}'])
-        sets = int(csv_row[f'Sets {interval_index}'])
+        reps = interval.reps
+        sets = interval.sets
 
         # Get the duration of all the components of the intervals
-        on_duration = get_zwift_duration(int(csv_row[f'Duration {interval_index}']))
-        off_duration = get_zwift_duration(int(csv_row[f'RBI {interval_index}']))
-        rbs_duration = get_zwift_duration(int(csv_row[f'RBS {interval_index}']))
+        on_duration = get_zwift_duration(interval.duration)
+        off_duration = get_zwift_duration(interval.rbi)
+        rbs_duration = get_zwift_duration(interval.rbs)
+
+        # The 'on' section(s) are identical for every rep in every set so only build them once
+        on = get_workout_period(
+            cts_power_zones=cts_power_zones,
+            on_zone=on_zone,
+            zwift_ftp=zwift_ftp,
+            midpoint=midpoint,
+            duration_seconds=on_duration
+        )
+
+        # Pre-render the whole rep block; every rep appends the same strings so there is no
+        # per-rep formatting left inside the loops
+        # In some cases (e.g. over-unders) there will be more than one component to the 'on' section
+        on_lines = [f'      {o}' for o in on]
+        off_line = f'      <SteadyState Duration="{off_duration}" Power="{off_pace}"/>'
+        rbs_line = f'      <SteadyState Duration="{rbs_duration}" Power="{off_pace}"/>'
+
+        # The description lines are just as invariant across the reps as the XML lines
+        off_watts = int(off_pace * zwift_ftp)
+        on_description = f'{get_textual_duration(on_duration)} @ {on_zone}'
+        off_description = f'{get_textual_duration(off_duration)} @ {off_watts} Watts rest'
+        rbs_description = f'{get_textual_duration(rbs_duration)} @ {off_watts} Watts rest between sets'
 
         # Loop through the sets
-        for set in range(sets):
+        for set_index in range(sets):
 
             # Loop through the reps in the set
-            for rep in range(reps):
-
-                # Add the 'on' section(s)
-                on = get_workout_period(
-                    cts_power_zones=cts_power_zones,
-                    on_zone=on_zone,
-                    zwift_ftp=zwift_ftp,
-                    midpoint=midpoint,
-                    duration_seconds=on_duration
-                )
-
-                # In some cases (e.g. over-unders) there will be more than one component to the interval
-                # Add them all
-                for o in on:
-                    workout.append(o)
-
-                # Add the 'off' section
-                off = ET.SubElement(workout, 'SteadyState')
-                off.set('Duration', str(off_duration))
-                off.set('Power', str(off_pace))
+            for rep_index in range(reps):
+
+                # Add the 'on' section(s) followed by the 'off' section
+                parts.extend(on_lines)
+                parts.append(off_line)
+                workout_description.append(on_description)
+                workout_description.append(off_description)
 
             # If there is a rest between sets (there usually will be if there is more than one set) then add it
             # Only add the RBS if we're not on the last interval
-            if rbs_duration > 0 and set != sets - 1:
-                rbs = ET.SubElement(workout, 'SteadyState')
-                rbs.set('Duration', str(rbs_duration))
-                rbs.set('Power', str(off_pace))
+            if rbs_duration > 0 and set_index != sets - 1:
+                parts.append(rbs_line)
+                workout_description.append(rbs_description)
 
         # If the workout consists of multiple sets of intervals then there is usually a rest period between them.
         # Add it if it exists
-        if f'RAS {interval_index}' in csv_row and not csv_row[f'RAS {interval_index}'].strip() == '':
-            ras_duration = get_zwift_duration(csv_row[f'RAS {interval_index}'])
-            if ras_duration > 0:
-                rbs = ET.SubElement(workout, 'SteadyState')
-                rbs.set('Duration', str(ras_duration))
-                rbs.set('Power', str(off_pace))
+        ras_duration = get_zwift_duration(interval.ras)
+        if ras_duration > 0:
+            parts.append(f'      <SteadyState Duration="{ras_duration}" Power="{off_pace}"/>')
+            workout_description.append(f'{get_textual_duration(ras_duration)} @ {off_watts} Watts rest after sets')
 
         # After each interval sets we add any filler to make sure the total duration of the workout is correct
         if filler_duration > 0:
-            filler = ET.SubElement(workout, 'SteadyState')
-            filler.set('Duration', str(filler_duration))
-            filler.set('Power', str(base_pace))
+            parts.append(filler)
+            workout_description.append(filler_description)
 
     # Add the cool down
     if cool_down_duration > 0:
-        cool_down = ET.SubElement(workout, 'CoolDown')
-        cool_down.set('Duration', str(get_zwift_duration(cool_down_duration)))
-        cool_down.set('PowerHigh', '0.25')
-        cool_down.set('PowerLow', '0.75')
+        parts.append(f'      <CoolDown Duration="{get_zwift_duration(cool_down_duration)}" PowerHigh="0.25" PowerLow="0.75"/>')
+        workout_description.append(f'{get_textual_duration(get_zwift_duration(cool_down_duration))} cool down')
 
-    # If the directory for the output files doesn't exist then make it.
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    # Close the document
+    parts.append('   </workout>')
+    parts.append('</workout_file>')
 
-    # Write XML file
-    xml_string = minidom.parseString(ET.tostring(workout_file)).toprettyxml(indent="   ")
-    with open(f'{directory}/{workout_name}.zwo', "w") as f:
-        f.write(xml_string)
+    # Now every section is known, fill in the description
+    if len(workout_description) > 0:
+        description_text = escape('\n'.join(workout_description))
+        parts[description_index] = f'   <description>{description_text}</description>'
 
-    return True
+    return workout_name, parts
+
+
+def write_workout(directory, workout_name, parts):
+    """
+    Writes a built workout document to disk.
+    This is separate from build_workout so the writes can run on a thread pool and
+    overlap with building the next workouts (file I/O releases the GIL)
+    :param directory: The directory to put the workout file in (it must already exist)
+    :param workout_name: The name of the workout (used as the file name)
+    :param parts: The XML lines of the workout document
+    """
+    # Stream the lines through the file buffer rather than
+    # materialising the whole document as one big string first
+    with open(directory / f'{workout_name}.zwo', 'w', buffering=64 * 1024, encoding='utf-8') as f:
+        for part in parts:
+            f.write(part)
+            f.write('\n')
 
 
 if __name__ == '__main__':
@@ -404,19 +465,41 @@ if __name__ == '__main__':
     parser.add_argument('--directory', help='The directory to put the output files in', default='output')
     args = parser.parse_args()
 
+    # Read the whole plan up front; training plans are small so this costs little memory
+    # and the numeric fields are coerced once per row by get_intervals.
+    # Rows stay as plain lists (no dict per row) and are indexed through the header map below
     with open(args.csv, 'r') as read_obj:
-        csv_reader = csv.DictReader(read_obj)
-
-        # Get the CTS power zones
-        cts_power_zones = get_power_zones(args.cts_power)
-
-        # Loop over each row in the CSV and create a workout for each row
-        for row in csv_reader:
-            generate_workout(
-                csv_row=row,
-                prefix=args.workout_prefix,
-                cts_power_zones=cts_power_zones,
-                zwift_ftp=args.zwift_ftp,
-                midpoint=args.midpoint,
-                directory=args.directory
-            )
+        csv_reader = csv.reader(read_obj)
+        header = next(csv_reader, None)
+        rows = list(csv_reader)
+
+    # Map each column name to its position in a row
+    column_indexes = {name: index for index, name in enumerate(header)} if header else dict()
+
+    # Get the CTS power zones
+    cts_power_zones = get_power_zones(args.cts_power)
+
+    # Make the output directory once up front rather than stat()ing it for every workout
+    output_directory = Path(args.directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    # Each row maps to its own workout file with no shared state,
+    # so the workouts can be built in parallel across CPU cores.
+    # The writes go to a thread pool so file I/O overlaps with building the next workouts
+    build = partial(
+        build_workout,
+        column_indexes=column_indexes,
+        prefix=args.workout_prefix,
+        cts_power_zones=cts_power_zones,
+        zwift_ftp=args.zwift_ftp,
+        midpoint=args.midpoint
+    )
+    with multiprocessing.Pool() as pool, ThreadPoolExecutor() as writer:
+        writes = [
+            writer.submit(write_workout, output_directory, workout_name, parts)
+            for workout_name, parts in pool.imap_unordered(build, rows)
+        ]
+
+        # Surface any errors from the write phase
+        for write in writes:
+            write.result()